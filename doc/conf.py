@@ -5,9 +5,7 @@
 
 # -- Project information -----------------------------------------------------
 # https://www.sphinx-doc.org/en/master/usage/configuration.html#project-information
-import sys
-import os
-sys.path.insert(0,os.path.abspath('..'))
+# The package is imported normally, so install it first (e.g. `pip install -e ..`).
 from supernodes import __version__
 
 project = 'SuperNodes'
@@ -1,47 +1,82 @@
 import glob
+import hashlib
 import os
-import subprocess
-from supernodes import SuperNode, InEquality
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import supernodes
 from rst_objects import Index, Section, Class, Example
 
-clear = True
+clear = "--clean" in sys.argv
 run = True
 
-if clear:
-    for file in glob.glob("*.rst"):
-        if not "template.rst" in file:
-            os.remove(file)
 
-classes = []
-for cls in (SuperNode, InEquality):
-    cls_object = Class(cls)
-    cls_object.to_rst()
-    classes.append(cls_object)
-
-examples = []
-examples_paths = glob.glob("../examples/*.py")
-for example in examples_paths:
-    example_object = Example(path=example)
+def build_example(path):
+    example_object = Example(path=path)
     example_object.to_rst()
-    examples.append(example_object)
+    return example_object
+
+
+def sources_stamp(examples_paths):
+    package_dir = os.path.dirname(supernodes.__file__)
+    paths = (examples_paths + glob.glob(os.path.join(package_dir, "*.py")) + glob.glob("_my_templates/*")
+             + ["rst_objects.py", "gen_docs.py", "../README.md"])
+    stamp = hashlib.blake2b(supernodes.__version__.encode(), digest_size=16)
+    for path in sorted(paths):
+        stamp.update(f"{path}:{os.stat(path).st_mtime_ns}\n".encode())
+    return stamp.hexdigest()
+
 
+def generate_rst(examples_paths):
+    if clear:
+        with os.scandir(".") as entries:
+            for entry in entries:
+                if entry.name.endswith(".rst") and not "template.rst" in entry.name:
+                    os.remove(entry.path)
 
-sections = []
-section_api = Section(title="API Reference", children_rst=[cls.cls_api for cls in classes],
-                  text="Here you can find the classes you can use in this package.")
-section_api.to_rst()
-sections.append(section_api)
+    classes = []
+    for cls in (supernodes.SuperNode, supernodes.InEquality, supernodes.CompiledTree,
+                supernodes.PackedTree):
+        cls_object = Class(cls)
+        cls_object.to_rst()
+        classes.append(cls_object)
 
-section_examples = Section(title="Examples", children_rst=[e.rst for e in examples],
-                           text="Here you can find some examples on using the package.")
-section_examples.to_rst()
-sections.append(section_examples)
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        examples = list(executor.map(build_example, examples_paths))
 
+    sections = []
+    section_api = Section(title="API Reference", children_rst=[cls.cls_api for cls in classes],
+                      text="Here you can find the classes you can use in this package.")
+    section_api.to_rst()
+    sections.append(section_api)
+
+    section_examples = Section(title="Examples", children_rst=[e.rst for e in examples],
+                               text="Here you can find some examples on using the package.")
+    section_examples.to_rst()
+    sections.append(section_examples)
+
+    index = Index(package_title="SuperNodes", readme_path="../README.md", sections=sections)
+    index.to_rst()
+
+
+examples_paths = glob.glob("../examples/*.py")
+stamp = sources_stamp(examples_paths)
+try:
+    with open(".gen_docs.stamp", "rt") as stamp_file:
+        up_to_date = stamp_file.read() == stamp
+except FileNotFoundError:
+    up_to_date = False
 
-index = Index(package_title="SuperNodes", readme_path="../README.md", sections=sections)
-index.to_rst()
+if clear or not up_to_date:
+    generate_rst(examples_paths)
+    with open(".gen_docs.stamp", "wt") as stamp_file:
+        stamp_file.write(stamp)
+else:
+    print("Sources unchanged, skipping RST generation.")
 
 
 if run:
-    subprocess.check_call(['make', 'clean'])
-    subprocess.check_call(['make', 'html'])
+    from sphinx.cmd.build import build_main
+    build_args = ["-j", "auto", "-b", "html", "-d", "_build/doctrees", ".", "_build/html"]
+    if clear:
+        build_args.insert(0, "-E")
+    sys.exit(build_main(build_args))
@@ -1,39 +1,82 @@
 import ast
+import atexit
+import functools
 import inspect
+import io
+import json
 import os
-from dataclasses import dataclass
+import tokenize
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 
 
-@dataclass
+os.makedirs(".jinja_cache", exist_ok=True)
+env = Environment(loader=FileSystemLoader("_my_templates"),
+                  bytecode_cache=FileSystemBytecodeCache(".jinja_cache"),
+                  auto_reload=False, keep_trailing_newline=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_template(name):
+    return env.get_template(name)
+
+
+for template_name in env.list_templates():
+    _load_template(template_name)
+
+try:
+    with open(".example_cache.json", "rt") as cache_file:
+        _example_cache = json.load(cache_file)
+except (FileNotFoundError, json.JSONDecodeError):
+    _example_cache = {}
+
+
+@atexit.register
+def _save_example_cache():
+    with open(".example_cache.json", "wt") as cache_file:
+        json.dump(_example_cache, cache_file)
+
+
+@dataclass(slots=True)
 class Index:
 
     package_title: str
     sections: list
     readme_path: str = None
+    under_title: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.under_title = len(self.package_title) * "="
 
     def to_rst(self):
-        index_dict = {"title": self.package_title,
-                      "under_title": len(self.package_title) * "=",
-                      "contents": "\n   ".join([s.title for s in self.sections])}
+        contents = [s.title for s in self.sections]
         if self.readme_path:
-            index_dict['read_me'] = f".. include:: {self.readme_path}\n   :parser: myst_parser.sphinx_"
-        else:
-            index_dict['read_me'] = ""
+            with open(self.readme_path, "rt") as file:
+                _write_if_changed("readme.md", file.read())
+            contents.insert(0, "readme")
+        index_dict = {"title": self.package_title,
+                      "under_title": self.under_title,
+                      "contents": "\n   ".join(contents)}
         replace_template(index_dict, "index_template.txt", "index.rst")
 
 
-@dataclass
+@dataclass(slots=True)
 class Section:
 
     title: str
     children_rst: list
     text: str = ""
+    under_title: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.under_title = len(self.title) * "="
 
     def to_rst(self):
         contents = "\n   ".join(self.children_rst)
         text = self.text
         section_dict = {"title": self.title,
-                                "under_title": len(self.title) * "=",
+                                "under_title": self.under_title,
                                 "text": text,
                                 "contents": contents}
         replace_template(section_dict, "section_template.txt", f"{self.title}.rst")
@@ -47,38 +90,50 @@ class Class:
         self.cls_api = f"{self.cls.__module__}.{self.cls.__name__}"
 
     def to_rst(self):
-        cls_api = f"{self.cls.__module__}.{self.cls.__name__}"
-        methods = [f for f in inspect.getmembers(self.cls, inspect.isfunction) if not f[0].startswith("_")]
+        cls_api = self.cls_api
+        cls_name = self.cls.__name__
+        methods = _public_methods(self.cls)
         methods_str = "\n   ".join([f"{cls_api}.{m[0]}" for m in methods])
-        cls_dict = {"class_name": self.cls.__name__,
-                    "under_class_name": "=" * len(self.cls.__name__),
+        cls_dict = {"class_name": cls_name,
+                    "under_class_name": "=" * len(cls_name),
                     "to_class": cls_api,
                     "methods": f"{methods_str}"}
-        if methods != []:
+        if methods:
             replace_template(cls_dict, "class_template.txt", f"{cls_api}.rst")
         else:
             replace_template(cls_dict, "class_methodless_template.txt", f"{cls_api}.rst")
+        jobs = []
         for method_name, method in methods:
             method_api = f"{cls_api}.{method_name}"
-            method_dict = {"method_name": f"{self.cls.__name__}.{method_name}",
-                           "under_method_name": "-" * len(f"{self.cls.__name__}.{method_name}"),
+            full_method_name = f"{cls_name}.{method_name}"
+            method_dict = {"method_name": full_method_name,
+                           "under_method_name": "-" * len(full_method_name),
                            "to_method": method_api}
-            replace_template(method_dict, "method_template.txt", f"{method_api}.rst")
+            jobs.append((method_dict, "method_template.txt", f"{method_api}.rst"))
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda job: replace_template(*job), jobs))
 
 
 class Example:
 
-    title: str = None
-    path: str
-    text: str = None
+    __slots__ = ("title", "path", "stem", "text", "code", "under_title", "rst")
 
     def __init__(self, path, title=None, text=None):
-        with open(path, "rt") as file:
-            content = file.read()
-            module = ast.parse(content, type_comments=True)
-        docstring = ast.get_docstring(module).strip().splitlines()
+        stat = os.stat(path)
+        cached = _example_cache.get(path)
+        if cached and cached[:2] == [stat.st_mtime_ns, stat.st_size]:
+            docstring, self.code = cached[2:]
+        else:
+            with open(path, "rt") as file:
+                content = file.read()
+            docstring, starting_line_num = _read_module_header(content)
+            lines = content.splitlines()
+            self.code = "\n   ".join(lines[starting_line_num:]) + "\n"
+            _example_cache[path] = [stat.st_mtime_ns, stat.st_size, docstring, self.code]
+        docstring = docstring.strip().splitlines()
         docstring_line_0 = docstring[0]
         self.path = path
+        self.stem = os.path.splitext(os.path.basename(path))[0]
         if title:
             self.title = title
         else:
@@ -87,27 +142,73 @@ class Example:
             self.text = text
         else:
             self.text = "\n".join(docstring[1:]).strip()
-        self.code = ""
-        starting_line_num = module.body[1].lineno
-        lines = content.splitlines()
-        for line in lines[starting_line_num:]:
-            self.code += line + "\n" + "   "
+        self.under_title = len(self.title) * "="
 
     def to_rst(self):
-        self.rst = f"Examples.{os.path.basename(self.path).removesuffix('.py')}"
+        self.rst = f"Examples.{self.stem}"
         example_dict = {"title": self.title,
-                        "under_title": len(self.title) * "=",
+                        "under_title": self.under_title,
                         "code": self.code,
                         "text": self.text,
                         "path": self.path}
         replace_template(example_dict, "code_template.txt", f"{self.rst}.rst")
 
 
+@functools.lru_cache(maxsize=None)
+def _public_methods(cls):
+    methods = {}
+    for klass in reversed(cls.__mro__):
+        for name, attr in vars(klass).items():
+            if name.startswith("_"):
+                continue
+            if inspect.isfunction(attr):
+                methods[name] = attr
+            else:
+                methods.pop(name, None)
+    return tuple(sorted(methods.items(), key=lambda method: method[0]))
+
+
+def _read_module_header(content):
+    """Returns the docstring of a module and the line number of its second statement."""
+    tokens = tokenize.generate_tokens(io.StringIO(content).readline)
+    significant = (token for token in tokens if token.type not in (tokenize.NL, tokenize.COMMENT))
+    try:
+        docstring_token, end_token, statement_token = next(significant), next(significant), next(significant)
+    except (StopIteration, tokenize.TokenError):
+        docstring_token = None
+    if (docstring_token and docstring_token.type == tokenize.STRING and end_token.type == tokenize.NEWLINE
+            and statement_token.type != tokenize.ENDMARKER):
+        docstring = ast.literal_eval(docstring_token.string)
+        if isinstance(docstring, str):
+            return inspect.cleandoc(docstring), statement_token.start[0]
+    module = ast.parse(content)
+    return ast.get_docstring(module), module.body[1].lineno
+
+
 def replace_template(dictionary, rst_template, new_rst_file):
-    with open("_my_templates/" + rst_template, "rt") as template:
-        text = template.read()
-        for key, value in dictionary.items():
-            text = text.replace("{{" + key + "}}", value)
-    with open(new_rst_file, "w") as new_file:
-        print(f"WRITING: {new_rst_file}")
-        new_file.write(text)
\ No newline at end of file
+    text = _load_template(rst_template).render(dictionary)
+    _write_if_changed(new_rst_file, text)
+
+
+def _write_if_changed(path, text):
+    data = text.encode()
+    try:
+        with open(path, "rb") as file:
+            if file.read() == data:
+                return
+    except FileNotFoundError:
+        pass
+    print(f"WRITING: {path}")
+    _atomic_write(path, data)
+
+
+def _atomic_write(path, data):
+    temp_path = f"{path}.tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    os.replace(temp_path, path)
\ No newline at end of file
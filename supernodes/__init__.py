@@ -1,4 +1,6 @@
 from .nodes import SuperNode
 from .operations import InEquality, operators
+from .compiled import CompiledTree
+from .packed import PackedTree
 
 __version__ = "v1.0.1"
\ No newline at end of file
@@ -0,0 +1,219 @@
+"""
+This is a module that contains the CompiledTree class.
+"""
+from functools import lru_cache
+from supernodes.operations import operators
+
+
+_op_codes = {op: code for code, op in enumerate(operators)}
+_flipped_ops = {"<": ">", "<=": ">=", "==": "==", "!=": "!=", ">=": "<=", ">": "<"}
+
+
+@lru_cache(maxsize=None)
+def _predict_kernel():
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+
+    @njit(cache=True, parallel=True)
+    def predict_rows(feature_idx, threshold, op_code, true_child, false_child, X, out):
+        for row in prange(X.shape[0]):
+            node = 0
+            while op_code[node] >= 0:
+                value = X[row, feature_idx[node]]
+                code = op_code[node]
+                if code == 0:
+                    output = value < threshold[node]
+                elif code == 1:
+                    output = value <= threshold[node]
+                elif code == 2:
+                    output = value == threshold[node]
+                elif code == 3:
+                    output = value != threshold[node]
+                elif code == 4:
+                    output = value >= threshold[node]
+                else:
+                    output = value > threshold[node]
+                following = true_child[node] if output else false_child[node]
+                if following < 0:
+                    break
+                node = following
+            out[row] = node
+
+    return predict_rows
+
+
+class CompiledTree:
+    """
+    A binary decision tree stored as flat `numpy` arrays instead of linked `SuperNode` objects.
+    It is created using :py:meth:`~SuperNode.compile` and is useful when the same tree runs on
+    many rows.
+
+    Each node of the tree has a position in the arrays below. A child position of ``-1`` means
+    that the tree stops at the node.
+
+    Attributes
+    ----------
+    nodes: list
+        The `SuperNode` objects of the tree. ``nodes[i]`` is the node at position ``i``.
+
+    features: list
+        The variable names of the inequalities. They are the columns of the array passed to
+        :py:meth:`~CompiledTree.predict`.
+
+    feature_idx: numpy.ndarray
+        The column compared by each node.
+
+    threshold: numpy.ndarray
+        The number that each node compares its column with.
+
+    op_code: numpy.ndarray
+        The position of each node's operator in `operators`, or ``-1`` if the node has no function.
+
+    true_child: numpy.ndarray
+        The position of the child chosen when the inequality is ``True``.
+
+    false_child: numpy.ndarray
+        The position of the child chosen when the inequality is ``False``.
+
+    Examples
+    --------
+
+    >>> from supernodes import SuperNode
+    >>> main_node = SuperNode(name="main-node", function="x > 10")
+    >>> main_node['first-child'] = SuperNode()
+    >>> main_node['second-child'] = SuperNode()
+    >>> main_node.child_name_if_true = "first-child"
+    >>> main_node.child_name_if_false = "second-child"
+    >>> tree = main_node.compile(features=["x"])
+    >>> [tree.nodes[i].name for i in tree.predict([[11], [3]])]
+    ['first-child', 'second-child']
+
+    """
+    def __init__(self, nodes, features, feature_idx, threshold, op_code, true_child, false_child):
+        import numpy as np
+        self.nodes = nodes
+        self.features = features
+        self.feature_idx = np.asarray(feature_idx, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.op_code = np.asarray(op_code, dtype=np.int8)
+        self.true_child = np.asarray(true_child, dtype=np.intp)
+        self.false_child = np.asarray(false_child, dtype=np.intp)
+
+    @classmethod
+    def from_node(cls, root, features):
+        """
+        Flattens the tree under `root`. Only the nodes that can be reached through
+        `child_name_if_true` and `child_name_if_false` are included.
+
+        Parameters
+        ----------
+        root: SuperNode
+
+        features: list
+            The variable names used by the inequalities, in the order of the columns of the array
+            that will be passed to :py:meth:`~CompiledTree.predict`.
+
+        Returns
+        -------
+        tree: CompiledTree
+
+        """
+        features = list(features)
+        feature_positions = {feature: num for num, feature in enumerate(features)}
+        nodes = [root]
+        feature_idx, threshold, op_code, true_child, false_child = [], [], [], [], []
+        for node in nodes:
+            if not node.function:
+                feature_idx.append(0)
+                threshold.append(0.0)
+                op_code.append(-1)
+                true_child.append(-1)
+                false_child.append(-1)
+                continue
+            feature, op, value = cls._parse_node(node, feature_positions)
+            feature_idx.append(feature)
+            threshold.append(value)
+            op_code.append(_op_codes[op])
+            for child_name, positions in ((node.child_name_if_true, true_child),
+                                          (node.child_name_if_false, false_child)):
+                child = node.get_child_from_name(child_name) if child_name else None
+                if child:
+                    positions.append(len(nodes))
+                    nodes.append(child)
+                else:
+                    positions.append(-1)
+        return cls(nodes, features, feature_idx, threshold, op_code, true_child, false_child)
+
+    @staticmethod
+    def _parse_node(node, feature_positions):
+        inequality = node._compiled()
+        if not hasattr(inequality, "_left_parts"):
+            raise ValueError(f"The function of {node} is not an inequality and cannot be compiled.")
+        left_variable, left_index, left_literal = inequality._left_parts
+        right_variable, right_index, right_literal = inequality._right_parts
+        op = inequality.middle
+        if left_variable in feature_positions and right_variable not in feature_positions:
+            variable, index, literal = left_variable, left_index, right_literal
+        elif right_variable in feature_positions and left_variable not in feature_positions:
+            variable, index, literal = right_variable, right_index, left_literal
+            op = _flipped_ops[op]
+        else:
+            raise ValueError(f"The inequality of {node} must compare exactly one feature with a number.")
+        if index is not None or isinstance(literal, str):
+            raise ValueError(f"The inequality of {node} must compare exactly one feature with a number.")
+        return feature_positions[variable], op, literal
+
+    def predict(self, X):
+        """
+        Runs the tree for every row of `X`. The result is the same as calling
+        :py:meth:`~SuperNode.run_as_binary_tree` with the features of each row as keyword arguments.
+        If `numba` is installed and `X` is numeric, the rows run in parallel in compiled code.
+
+        Parameters
+        ----------
+        X: array_like
+            A 2D array with one row per sample and one column per feature.
+
+        Returns
+        -------
+        positions: numpy.ndarray
+            The position in `nodes` of the node reached by each row.
+
+        """
+        import numpy as np
+        X = np.asarray(X)
+        kernel = _predict_kernel()
+        if kernel is not None and X.ndim == 2 and X.dtype.kind in "biuf":
+            reached = np.empty(len(X), dtype=np.intp)
+            kernel(self.feature_idx, self.threshold, self.op_code, self.true_child,
+                   self.false_child, np.ascontiguousarray(X, dtype=np.float64), reached)
+            return reached
+        return self._predict_levels(X)
+
+    def _predict_levels(self, X):
+        # Moves every row down one level per iteration, using numpy masks instead of a row loop.
+        import numpy as np
+        reached = np.zeros(len(X), dtype=np.intp)
+        active = np.arange(len(X))
+        while len(active):
+            current = reached[active]
+            codes = self.op_code[current]
+            values = X[active, self.feature_idx[current]]
+            thresholds = self.threshold[current]
+            output = np.zeros(len(active), dtype=bool)
+            for code, op in enumerate(operators.values()):
+                mask = codes == code
+                output[mask] = op(values[mask], thresholds[mask])
+            following = np.where(output, self.true_child[current], self.false_child[current])
+            following[codes < 0] = -1
+            moving = following >= 0
+            active = active[moving]
+            reached[active] = following[moving]
+        return reached
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -1,14 +1,72 @@
 """
 This is a module that contains the SuperNode class.
 """
+from functools import lru_cache
 from typing import Any, Callable, Union, Hashable
-import yaml
-import pandas as pd
+import pickle
+import sys
+import weakref
 from supernodes.operations import InEquality
-from copy import copy
-
-
-yaml.Dumper.ignore_aliases = lambda *args : True
+from supernodes.compiled import CompiledTree
+from supernodes.packed import PackedTree
+
+_ATTRIBUTE_FIELDS = ("name", "value", "id", "function", "child_name_if_true", "child_name_if_false")
+_SERIALIZED_FIELDS = _ATTRIBUTE_FIELDS + ("other_attrs",)
+
+
+def _intern(value):
+    # Names repeat a lot in trees built from DataFrames, so equal strings share one object.
+    return sys.intern(value) if type(value) is str else value
+
+
+def _json_default(value):
+    import numpy as np
+    if isinstance(value, InEquality):
+        return f"{value.left} {value.middle} {value.right}"
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"Objects of type '{type(value).__name__}' cannot be saved to JSON.")
+
+
+@lru_cache(maxsize=None)
+def _yaml_classes():
+    try:
+        from yaml import CSafeLoader as loader, CDumper as base_dumper
+    except ImportError:
+        from yaml import SafeLoader as loader, Dumper as base_dumper
+
+    class YamlDumper(base_dumper):
+
+        def ignore_aliases(self, data):
+            return True
+
+    return loader, YamlDumper
+
+
+def _emit_yaml_data(dumper, data):
+    import yaml
+    stack = [dumper.represent_data(data)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, yaml.Event):
+            dumper.emit(item)
+        elif isinstance(item, yaml.ScalarNode):
+            detected_tag = dumper.resolve(yaml.ScalarNode, item.value, (True, False))
+            default_tag = dumper.resolve(yaml.ScalarNode, item.value, (False, True))
+            implicit = (item.tag == detected_tag, item.tag == default_tag)
+            dumper.emit(yaml.ScalarEvent(None, item.tag, implicit, item.value, style=item.style))
+        elif isinstance(item, yaml.SequenceNode):
+            implicit = item.tag == dumper.resolve(yaml.SequenceNode, item.value, True)
+            dumper.emit(yaml.SequenceStartEvent(None, item.tag, implicit, flow_style=item.flow_style))
+            stack.append(yaml.SequenceEndEvent())
+            stack.extend(reversed(item.value))
+        else:
+            implicit = item.tag == dumper.resolve(yaml.MappingNode, item.value, True)
+            dumper.emit(yaml.MappingStartEvent(None, item.tag, implicit, flow_style=item.flow_style))
+            stack.append(yaml.MappingEndEvent())
+            for key, value in reversed(item.value):
+                stack.append(value)
+                stack.append(key)
 
 
 class SuperNode:
@@ -31,7 +89,9 @@ class SuperNode:
         Here you can store additional attributes.
 
     children: list
-        A list of children nodes.
+        A list of children nodes. Add or replace children using :py:meth:`~SuperNode.append`,
+        :py:meth:`~SuperNode.insert`, the indexer, or by assigning a new list, so that looking up
+        children by name stays in sync.
 
     function: Callable, str
         A function to be called when running the tree as a decision tree. This attribute can
@@ -82,13 +142,17 @@ class SuperNode:
 
     """
 
+    __slots__ = ("_name", "value", "id", "_children", "_children_by_name", "function", "child_name_if_true",
+                 "child_name_if_false", "other_attrs", "_compiled_function", "_parent", "__weakref__")
+
     def __init__(self, name: Union[str, int, Hashable] = None, value: Any = None, id: Any = None,
                  children: list = None, function: Callable = None,
                  child_name_if_true: Union[str, int, Hashable] = None,
                  child_name_if_false: Union[str, int, Hashable] = None, **other_attrs):
-        self.name = name
+        self._name = _intern(name)
+        self._parent = None
         self.value = value
-        self.id = id
+        self.id = _intern(id)
         if children:
             self.children = children
         else:
@@ -97,13 +161,62 @@ class SuperNode:
         self.child_name_if_true = child_name_if_true
         self.child_name_if_false = child_name_if_false
         self.other_attrs = other_attrs
-
-    def _object_to_node(self, object):
-        if type(object) is SuperNode:
-            return object
-        else:
-            node = SuperNode(value=object)
-            return node
+        self._compiled_function = None
+
+    def __getstate__(self):
+        # `_compiled_function` is only a cache of `function`, and the parent is a weak reference that
+        # the parent sets again when it is loaded, so neither is saved.
+        return None, {key: getattr(self, key) for key in self.__slots__
+                      if key not in ("_compiled_function", "_parent", "__weakref__")}
+
+    def __setstate__(self, state):
+        for key, value in state[1].items():
+            setattr(self, key, value)
+        self._compiled_function = None
+        self._parent = None
+        parent = weakref.ref(self)
+        for child in self._children:
+            child._parent = parent
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+        parent = self._parent() if self._parent is not None else None
+        if parent is not None:
+            parent._index_children()
+
+    @property
+    def children(self):
+        return self._children
+
+    @children.setter
+    def children(self, children):
+        self._children = children
+        parent = weakref.ref(self)
+        for child in children:
+            child._parent = parent
+        self._index_children()
+
+    def _index_children(self):
+        # Filled from the last child to the first, so the first child with a name wins.
+        names = [child._name for child in self._children]
+        self._children_by_name = dict(zip(reversed(names), range(len(names) - 1, -1, -1)))
+
+    def _child_position(self, name):
+        # Renamed children update the index through their parent. A found position is still checked,
+        # since children may have been removed from the list directly.
+        position = self._children_by_name.get(name)
+        if position is None:
+            return None
+        children = self._children
+        if position < len(children) and children[position]._name == name:
+            return position
+        self._index_children()
+        return self._children_by_name.get(name)
 
     def has_children(self):
         """
@@ -144,9 +257,9 @@ class SuperNode:
             If the child node was not found.
 
         """
-        for child in self.children:
-            if child.name == name:
-                return child
+        position = self._child_position(name)
+        if position is not None:
+            return self._children[position]
 
     def append(self, node: Union['SuperNode', Any]):
         """
@@ -159,10 +272,13 @@ class SuperNode:
             The value of the `SuperNode` object will be the value of the `node` parameter.
 
         """
-        node = self._object_to_node(node)
-        if node.name in self.get_children_names():
+        if not isinstance(node, SuperNode):
+            node = SuperNode(value=node)
+        if node.name is not None and self._child_position(node.name) is not None:
             raise ValueError("Two children of the same Node cannot have the same 'name' attribute.")
+        node._parent = weakref.ref(self)
         self.children.append(node)
+        self._children_by_name.setdefault(node.name, len(self.children) - 1)
 
     def insert(self, index, node):
         """
@@ -177,15 +293,18 @@ class SuperNode:
             The value of the `SuperNode` object will be the value of the `node` parameter.
 
         """
-        node = self._object_to_node(node)
-        if node.name in self.get_children_names():
+        if not isinstance(node, SuperNode):
+            node = SuperNode(value=node)
+        if node.name is not None and self._child_position(node.name) is not None:
             raise ValueError("Two children of the same Node cannot have the same 'name' attribute.")
-        self.insert(index, node)
+        node._parent = weakref.ref(self)
+        self.children.insert(index, node)
+        self._index_children()
 
     def get_attributes(self, none_attrs=True):
-        attrs ={k:v for k, v in self.__dict__.items() if not k.startswith('_') and not k == "other_attrs"}
-        for k, v in self.other_attrs:
-            attrs[k] = v
+        attrs = {k:getattr(self, k) for k in _ATTRIBUTE_FIELDS}
+        attrs["children"] = self.children
+        attrs.update(self.other_attrs)
         if not none_attrs:
             attrs = {k:v for k,v in attrs.items() if v is not None}
         return attrs
@@ -195,9 +314,24 @@ class SuperNode:
         return self
 
     def __copy__(self):
-        node = SuperNode()
-        node.from_node_dict(self.to_node_dict())
-        return node
+        root = self._clone_node()
+        stack = [(self, root)]
+        while stack:
+            node, clone = stack.pop()
+            children = []
+            for child in node.children:
+                child_clone = child._clone_node()
+                children.append(child_clone)
+                stack.append((child, child_clone))
+            clone.children = children
+        return root
+
+    def _clone_node(self):
+        clone = SuperNode(name=self.name, value=self.value, id=self.id, function=self.function,
+                          child_name_if_true=self.child_name_if_true,
+                          child_name_if_false=self.child_name_if_false)
+        clone.other_attrs = dict(self.other_attrs)
+        return clone
 
     def __str__(self):
         return self.to_str()
@@ -209,15 +343,11 @@ class SuperNode:
         text = str(text)
         if len(text) <= 20 and not "\n" in text:
             return text
-        new_text = ""
         text = text.strip()
-        for char_num in range(20):
-            char = text[char_num]
-            if char == "\n":
-                break
-            new_text += char
-        new_text += " ..."
-        return new_text
+        end = text.find("\n", 0, 20)
+        if end == -1:
+            end = 20
+        return text[:end] + " ..."
 
     def to_str(self):
         """
@@ -228,30 +358,27 @@ class SuperNode:
         str
 
         """
-        as_string = "("
+        lines = []
+        stack = [(self, "", "")]
+        while stack:
+            node, first_line_prefix, prefix = stack.pop()
+            lines.append(first_line_prefix + node._node_str())
+            last = len(node.children) - 1
+            for num in range(last, -1, -1):
+                child_prefix = prefix + ("|    " if num < last else "     ")
+                stack.append((node.children[num], prefix + "|__ ", child_prefix))
+        return "\n".join(lines)
+
+    def _node_str(self):
+        attrs = []
         for attr_name, attr in self.get_attributes(none_attrs=False).items():
             if attr_name == "children":
                 continue
             elif attr_name == "value":
-                as_string += f"{attr_name}: {attr.__class__.__name__}, "
+                attrs.append(f"{attr_name}: {attr.__class__.__name__}")
             else:
-                as_string += f"{attr_name}={self._short(attr)}, "
-        if as_string.endswith(", "):
-            as_string = as_string.removesuffix(", ")
-        as_string += ")"
-        spaces = f"{' ' * 4}"
-        for num, child in enumerate(self.children):
-            as_string += '\n'
-            child_str = child.to_str()
-            as_string += f"|"
-            as_string += "__ "
-            as_string += child_str.splitlines()[0]
-            for line in child_str.splitlines()[1:]:
-                if num < len(self.children) - 1:
-                    as_string += "\n" + "|" + spaces + line
-                else:
-                    as_string += "\n" + " " + spaces + line
-        return as_string
+                attrs.append(f"{attr_name}={self._short(attr)}")
+        return "(" + ", ".join(attrs) + ")"
 
     def to_node_dict(self):
         """
@@ -262,10 +389,20 @@ class SuperNode:
         dict
 
         """
-        dictionary = {key:value for key, value in self.__dict__.items() if not key.startswith("_") and not key == "children"}
-        dictionary["children"] = [child.to_node_dict() for child in self.children]
+        dictionary = self._attrs_dict()
+        stack = [(self, dictionary)]
+        while stack:
+            node, node_dict = stack.pop()
+            node_dict["children"] = []
+            for child in node.children:
+                child_dict = child._attrs_dict()
+                node_dict["children"].append(child_dict)
+                stack.append((child, child_dict))
         return dictionary
 
+    def _attrs_dict(self):
+        return {key:getattr(self, key) for key in _SERIALIZED_FIELDS}
+
     def from_node_dict(self, dictionary):
         """
         Creates a node from a dictionary. The dictionary should have keys that are the same
@@ -276,12 +413,24 @@ class SuperNode:
         dictionary: dict
 
         """
+        self._set_attrs(dictionary)
+        stack = [(self, dictionary)]
+        while stack:
+            node, node_dict = stack.pop()
+            children = []
+            for child_dict in node_dict['children']:
+                child = SuperNode()
+                child._set_attrs(child_dict)
+                children.append(child)
+                stack.append((child, child_dict))
+            node.children = children
+
+    def _set_attrs(self, dictionary):
         for key, value in dictionary.items():
             if not key == "children":
-                if not key in self.__dict__.keys():
+                if not key in _SERIALIZED_FIELDS:
                     raise KeyError(f"'{key}' is not an attribute of `Node` object.")
-                self.__dict__[key] = value
-        self.children = [SuperNode().from_node_dict(child) for child in dictionary['children']]
+                setattr(self, key, value)
 
     def to_yaml(self, file_path):
         """
@@ -293,8 +442,36 @@ class SuperNode:
             Path to the YAML file.
 
         """
+        import yaml
         with open(file_path, "w") as file:
-            yaml.dump(self.to_node_dict(), file, sort_keys=False)
+            dumper = _yaml_classes()[1](file, default_flow_style=False, sort_keys=False)
+            try:
+                dumper.open()
+                dumper.emit(yaml.DocumentStartEvent())
+                self._emit_yaml(dumper)
+                dumper.emit(yaml.DocumentEndEvent())
+                dumper.close()
+            finally:
+                dumper.dispose()
+
+    def _emit_yaml(self, dumper):
+        # Emits the tree node by node, so the whole node dictionary is never built in memory.
+        import yaml
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if not isinstance(item, SuperNode):
+                dumper.emit(item)
+                continue
+            dumper.emit(yaml.MappingStartEvent(None, "tag:yaml.org,2002:map", True, flow_style=False))
+            for key, value in item._attrs_dict().items():
+                _emit_yaml_data(dumper, key)
+                _emit_yaml_data(dumper, value)
+            _emit_yaml_data(dumper, "children")
+            dumper.emit(yaml.SequenceStartEvent(None, "tag:yaml.org,2002:seq", True, flow_style=False))
+            stack.append(yaml.MappingEndEvent())
+            stack.append(yaml.SequenceEndEvent())
+            stack.extend(reversed(item.children))
 
     def from_yaml(self, file_path):
         """
@@ -307,8 +484,83 @@ class SuperNode:
             Path to the YAML file.
 
         """
+        import yaml
         with open(file_path, "rt") as file:
-            dictionary = yaml.safe_load(file)
+            dictionary = yaml.load(file, Loader=_yaml_classes()[0])
+            self.from_node_dict(dictionary)
+
+    def to_pickle(self, file_path):
+        """
+        Saves the node and its descendants to a pickle file. Pickle files are much faster to save and
+        load than YAML files, but they are not human-readable. Use :py:meth:`~SuperNode.to_yaml`
+        if the file needs to be read or edited by hand.
+
+        Parameters
+        ----------
+        file_path: str
+            Path to the pickle file.
+
+        """
+        with open(file_path, "wb") as file:
+            pickle.dump(self.to_node_dict(), file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def from_pickle(self, file_path):
+        """
+        Creates a node from a pickle file saved by :py:meth:`~SuperNode.to_pickle`. Only load
+        pickle files that you trust, since loading a pickle file can run arbitrary code.
+
+        Parameters
+        ----------
+        file_path: str
+            Path to the pickle file.
+
+        """
+        with open(file_path, "rb") as file:
+            dictionary = pickle.load(file)
+            self.from_node_dict(dictionary)
+
+    def to_json(self, file_path):
+        """
+        Saves the node and its descendants to a JSON file. If `orjson` is installed it is used to
+        write the file, which is much faster than YAML. Otherwise the standard `json` module is used.
+        `InEquality` objects are saved as their inequality string and `numpy` values as numbers or
+        lists. Other values that JSON does not support, such as functions, raise a ``TypeError``.
+
+        Parameters
+        ----------
+        file_path: str
+            Path to the JSON file.
+
+        """
+        dictionary = self.to_node_dict()
+        try:
+            import orjson
+        except ImportError:
+            import json
+            data = json.dumps(dictionary, default=_json_default).encode()
+        else:
+            options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            data = orjson.dumps(dictionary, default=_json_default, option=options)
+        with open(file_path, "wb") as file:
+            file.write(data)
+
+    def from_json(self, file_path):
+        """
+        Creates a node from a JSON file saved by :py:meth:`~SuperNode.to_json`. `orjson` is used
+        if it is installed.
+
+        Parameters
+        ----------
+        file_path: str
+            Path to the JSON file.
+
+        """
+        try:
+            from orjson import loads
+        except ImportError:
+            from json import loads
+        with open(file_path, "rb") as file:
+            dictionary = loads(file.read())
             self.from_node_dict(dictionary)
 
     def split(self, num: int=2, names: list=None, values: list=None, ids: list=None, functions: list=None,
@@ -379,11 +631,7 @@ class SuperNode:
             List of rows. Each row consists of nodes names.
 
         """
-        arr = []
-        row = []
-        for row in self._rows_iter(row, attr):
-            arr.append(row)
-        return arr
+        return [list(row) for row in self._rows_iter(attr)]
 
     def split_on_df_column(self, df, column):
         """
@@ -418,9 +666,8 @@ class SuperNode:
 
         """
         nodes = []
-        unique_values = df[column].unique()
-        for unique_value in unique_values:
-            node = SuperNode(name=unique_value, value=df[df[column] == unique_value])
+        for unique_value, group_df in df.groupby(column, sort=False, dropna=False, observed=True):
+            node = SuperNode(name=unique_value, value=group_df)
             nodes.append(node)
             self.append(node)
         return nodes
@@ -452,24 +699,30 @@ class SuperNode:
         """
         if len(df.columns) > 0:
             nodes = self.split_on_df_column(df, column=df.columns[0])
+            remaining_columns = df.columns[1:]
             for node in nodes:
-                smaller_df = node.value[df.columns[1:]]
-                node.from_df(smaller_df)
+                node.from_df(node.value[remaining_columns])
 
-    def _rows_iter(self, row, attr):
-        row = copy(row)
-        if not attr:
-            row.append(self)
-        else:
-            if attr in [key for key in self.__dict__.keys() if not key.startswith("_")]:
-                row.append(self.__dict__[attr])
-            elif attr in self.other_attrs.keys():
-                row.append(self.other_attrs[attr])
-        if not self.has_children():
-            yield row
-        for child in self.children:
-            for new_row in child._rows_iter(row=row, attr=attr):
-                yield new_row
+    def _rows_iter(self, attr=None):
+        # One row is shared by the whole walk and cut back to each node's parent prefix, so it is
+        # only copied when a leaf is reached.
+        row = []
+        stack = [(self, 0)]
+        while stack:
+            node, length = stack.pop()
+            del row[length:]
+            if not attr:
+                row.append(node)
+            else:
+                if attr in _SERIALIZED_FIELDS:
+                    row.append(getattr(node, attr))
+                elif attr in node.other_attrs.keys():
+                    row.append(node.other_attrs[attr])
+            if not node.has_children():
+                yield tuple(row)
+            length = len(row)
+            for child in reversed(node.children):
+                stack.append((child, length))
 
     def to_df(self, columns=None, ignore_first=True, attr="name"):
         """
@@ -489,12 +742,11 @@ class SuperNode:
         df: pandas.DataFrame
 
         """
+        import pandas as pd
+        rows = self._rows_iter(attr)
         if ignore_first:
-            data = [l[1:] for l in self.to_list(attr=attr)]
-        else:
-            data = self.to_list(attr=attr)
-        df = pd.DataFrame(data, columns=columns)
-        return df
+            rows = (row[1:] for row in rows)
+        return pd.DataFrame(list(rows), columns=columns)
 
     def find_node(self, id):
         """
@@ -512,11 +764,9 @@ class SuperNode:
         None
 
         """
-        for child in self.children:
-            if child.id == id:
-                return child
-            if child.find_node(id=id):
-                return child
+        for node in self._iter_descendants():
+            if node.id == id:
+                return node
 
     def find_nodes(self, name=None, value=None, function=None, **other_attrs):
         """
@@ -535,25 +785,28 @@ class SuperNode:
         descendants: list of nodes
 
         """
-        descendants = []
-        for child in self.children:
-            add_child = True
-            if name and child.name != name:
-                add_child = False
-            if value and child.value != value:
-                add_child = False
-            if function and child.function != function:
-                add_child = False
-            if other_attrs != {}:
-                for key, value in other_attrs.items():
-                    if not key in child.other_attrs.keys():
-                        add_child = False
-                    elif value != child.other_attrs[key]:
-                        add_child = False
-            if add_child:
-                descendants.append(child)
-            descendants += child.find_nodes(name=name, value=value, function=function, **other_attrs)
-        return descendants
+        checks = []
+        if name:
+            checks.append(lambda node: node.name == name)
+        if value:
+            checks.append(lambda node: node.value == value)
+        if function:
+            checks.append(lambda node: node.function == function)
+        for key, attr_value in other_attrs.items():
+            checks.append(lambda node, key=key, attr_value=attr_value:
+                          key in node.other_attrs and node.other_attrs[key] == attr_value)
+        if not checks:
+            return list(self._iter_descendants())
+        if len(checks) == 1:
+            return list(filter(checks[0], self._iter_descendants()))
+        return [node for node in self._iter_descendants() if all(check(node) for check in checks)]
+
+    def _iter_descendants(self):
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
 
     def __getitem__(self, name):
         """
@@ -581,13 +834,16 @@ class SuperNode:
         node: SuperNode, Any
 
         """
-        for i, child in enumerate(self.children):
-            if child.name == name:
-                self.children.pop(i)
-                break
-        node = self._object_to_node(node)
+        if not isinstance(node, SuperNode):
+            node = SuperNode(value=node)
+        position = self._child_position(name)
+        if position is not None:
+            del self.children[position]
+            self._index_children()
         node.name = name
-        self.append(node)
+        node._parent = weakref.ref(self)
+        self.children.append(node)
+        self._children_by_name.setdefault(name, len(self.children) - 1)
 
     def run_as_binary_tree(self, **kwargs):
         """
@@ -623,23 +879,135 @@ class SuperNode:
             Either the leaf node will be returned or a node that has no function.
 
         """
-        if not self.function:
-            return self
-        if type(self.function) is str:
-            output = InEquality(self.function)(**kwargs)
-        else:
-            output = self.function(**kwargs)
-        if output:
-            if self.child_name_if_true:
-                child = self.get_child_from_name(self.child_name_if_true)
-                if child:
-                    return child.run_as_binary_tree(**kwargs)
-        elif output is False:
-            if self.child_name_if_false:
-                child = self.get_child_from_name(self.child_name_if_false)
-                if child:
-                    return child.run_as_binary_tree(**kwargs)
-        return self
+        node = self
+        while node.function:
+            output = node._compiled()(**kwargs)
+            if output:
+                child_name = node.child_name_if_true
+            elif output is False:
+                child_name = node.child_name_if_false
+            else:
+                break
+            child = node.get_child_from_name(child_name) if child_name else None
+            if not child:
+                break
+            node = child
+        return node
+
+    def run_as_binary_tree_batch(self, df):
+        """
+        Runs the tree as a binary decision tree for every row of a `pandas` `DataFrame`. The result
+        is the same as calling :py:meth:`~SuperNode.run_as_binary_tree` with the columns of each row
+        as keyword arguments, but inequality strings and `InEquality` objects are evaluated on
+        whole columns at once. Other functions are still called once per row.
+
+        Parameters
+        ----------
+        df: pandas.DataFrame
+            Each column is a keyword argument that the functions inside the tree accept.
+
+        Returns
+        -------
+        nodes: pandas.Series
+            The node reached by each row. It has the same index as `df`.
+
+        Examples
+        --------
+
+        >>> import pandas as pd
+        >>> main_node = SuperNode(name="main-node", function="x > 10")
+        >>> main_node['first-child'] = SuperNode()
+        >>> main_node['second-child'] = SuperNode()
+        >>> main_node.child_name_if_true = "first-child"
+        >>> main_node.child_name_if_false = "second-child"
+        >>> leaves = main_node.run_as_binary_tree_batch(pd.DataFrame({"x": [11, 3]}))
+        >>> [leaf.name for leaf in leaves]
+        ['first-child', 'second-child']
+
+        """
+        import numpy as np
+        import pandas as pd
+        reached = []
+        reached_index = np.empty(len(df), dtype=np.intp)
+        stack = [(self, np.arange(len(df)))]
+        while stack:
+            node, positions = stack.pop()
+            remaining = np.ones(len(positions), dtype=bool)
+            if node.function and len(positions) > 0:
+                rows = df.iloc[positions]
+                if isinstance(node.function, (str, InEquality)):
+                    inequality = node._compiled()
+                    is_true = inequality.vectorize(rows).astype(bool)
+                    is_false = ~is_true
+                else:
+                    outputs = [node.function(**row) for row in rows.to_dict("records")]
+                    is_true = np.array([bool(output) for output in outputs], dtype=bool)
+                    is_false = np.array([output is False for output in outputs], dtype=bool)
+                for mask, child_name in ((is_true, node.child_name_if_true), (is_false, node.child_name_if_false)):
+                    if child_name:
+                        child = node.get_child_from_name(child_name)
+                        if child:
+                            stack.append((child, positions[mask]))
+                            remaining &= ~mask
+            reached_index[positions[remaining]] = len(reached)
+            reached.append(node)
+        nodes = np.empty(len(reached), dtype=object)
+        for num, node in enumerate(reached):
+            nodes[num] = node
+        return pd.Series(nodes[reached_index], index=df.index, dtype=object)
+
+    def pack(self):
+        """
+        Stores a snapshot of the tree in a :py:class:`~PackedTree`, which keeps the nodes and their
+        `name`, `value` and `id` attributes in flat arrays. Running bulk operations such as
+        :py:meth:`~PackedTree.to_df` or :py:meth:`~PackedTree.find_nodes` on the `PackedTree` avoids
+        walking the linked nodes every time.
+
+        Returns
+        -------
+        tree: PackedTree
+
+        """
+        return PackedTree.from_node(self)
+
+    def compile(self, features):
+        """
+        Flattens the tree into a :py:class:`~CompiledTree` that stores the nodes as `numpy` arrays.
+        This is faster than :py:meth:`~SuperNode.run_as_binary_tree` when the same tree runs on
+        many rows. Every `function` in the tree must be an inequality string or an `InEquality`
+        object that compares one of the `features` with a number.
+
+        Parameters
+        ----------
+        features: list
+            The variable names used by the inequalities, in the order of the columns of the array
+            that will be passed to :py:meth:`~CompiledTree.predict`.
+
+        Returns
+        -------
+        tree: CompiledTree
+
+        Examples
+        --------
+
+        >>> main_node = SuperNode(name="main-node", function="x > 10")
+        >>> main_node['first-child'] = SuperNode()
+        >>> main_node['second-child'] = SuperNode()
+        >>> main_node.child_name_if_true = "first-child"
+        >>> main_node.child_name_if_false = "second-child"
+        >>> tree = main_node.compile(features=["x"])
+        >>> tree.predict([[11], [3]])
+        array([1, 2])
+
+        """
+        return CompiledTree.from_node(self, features)
+
+    def _compiled(self):
+        # Inequality strings are parsed once and reused until `function` is changed.
+        if self._compiled_function is None or self._compiled_function[0] != self.function:
+            function = InEquality(self.function) if isinstance(self.function, str) else self.function
+            self._compiled_function = (self.function, function)
+        return self._compiled_function[1]
 
 if __name__ == "__main__":
     import doctest
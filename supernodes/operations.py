@@ -3,7 +3,6 @@ This is a module that transforms a string to an inequality.
 """
 import operator
 import re
-from decimal import Decimal
 
 
 operators = {"<": operator.lt,
@@ -13,17 +12,18 @@ operators = {"<": operator.lt,
           ">=": operator.ge,
           ">": operator.gt}
 
-def _is_int(string_num):
-    return string_num.isdigit()
+_operand_pattern = re.compile(r"(\w+)(?:\[(.+)\])?")
 
 
-def _is_decimal(string_num):
-    if _is_int(string_num): return False
+def _to_number(string_num):
     try:
-        float(string_num)
-        return True
+        return int(string_num)
     except ValueError:
-        return False
+        pass
+    try:
+        return float(string_num)
+    except ValueError:
+        return string_num
 
 
 class InEquality:
@@ -75,7 +75,7 @@ class InEquality:
     Running the decision tree:
 
     >>> main_node.run_as_binary_tree(x=101)
-    (name=second-child, value: NoneType)
+    (name=second-child)
 
     """
     def __init__(self, inequality: str, strings_to_numbers=True):
@@ -97,46 +97,97 @@ class InEquality:
         self.middle = inequality_list[1]
         self.right = inequality_list[2]
         self.strings_to_numbers = strings_to_numbers
+        self._parse()
+
+    def _parse(self):
+        if self.middle not in operators:
+            raise ValueError(f"'{self.middle}' is not a supported operator.")
+        self._op = operators[self.middle]
+        self._left_parts = self._parse_operand(self.left)
+        self._right_parts = self._parse_operand(self.right)
+        self._left_operand = self._compile_operand(*self._left_parts)
+        self._right_operand = self._compile_operand(*self._right_parts)
+
+    def __getstate__(self):
+        # The operand closures cannot be pickled, so only the inequality is saved and parsed again.
+        return {"left": self.left, "middle": self.middle, "right": self.right,
+                "strings_to_numbers": self.strings_to_numbers}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._parse()
 
     def __call__(self, **kwargs):
-        left = self.left
-        right = self.right
-        left_indices = re.findall(r"\w+\[(.+)\]", left)
-        right_indices = re.findall(r"\w+\[(.+)\]", right)
-        for key, value in kwargs.items():
-            if left == key or re.search(f"{key}" + r"\[(.+)\]", left):
-                left = value
-                break
-        for key, value in kwargs.items():
-            if right == key or re.search(f"{key}" + r"\[(.+)\]", right):
-                right = value
-                break
+        return self._op(self._left_operand(kwargs), self._right_operand(kwargs))
+
+    def vectorize(self, df):
+        """
+        Runs the inequality on every row of a `pandas` `DataFrame` at once. Variables are taken
+        from the columns of the `DataFrame`.
+
+        Parameters
+        ----------
+        df: pandas.DataFrame
+
+        Returns
+        -------
+        numpy.ndarray
+            An array with one boolean per row.
+
+        Examples
+        --------
+
+        >>> import pandas as pd
+        >>> inequality = InEquality("x[0] < y")
+        >>> inequality.vectorize(pd.DataFrame({"x": [[1, 2], [5, 6]], "y": [3, 3]}))
+        array([ True, False])
+
+        """
+        import numpy as np
+        left = self._column_values(df, *self._left_parts)
+        right = self._column_values(df, *self._right_parts)
+        return np.broadcast_to(self._op(left, right), (len(df),))
+
+    def _convert(self, string_num):
         if self.strings_to_numbers:
-            if type(left) is str:
-                if _is_int(left):
-                    left = int(left)
-                elif _is_decimal(left):
-                    left = Decimal(left)
-            if type(right) is str:
-                if _is_int(right):
-                    right = int(right)
-                elif _is_decimal(right):
-                    right = float(right)
-            for index in left_indices:
-                if _is_int(index):
-                    index = int(index)
-                elif _is_decimal(index):
-                    index = float(index)
-                left = left[index]
-            for index in right_indices:
-                if _is_int(index):
-                    index = int(index)
-                elif _is_decimal(index):
-                    index = float(index)
-                right = right[index]
-        oper = operators[self.middle]
-        out = oper(left, right)
-        return out
+            return _to_number(string_num)
+        return string_num
+
+    def _parse_operand(self, operand):
+        literal = self._convert(operand)
+        match = _operand_pattern.fullmatch(operand)
+        if not match:
+            return None, None, literal
+        variable, index = match.groups()
+        if index is not None:
+            index = _to_number(index)
+        return variable, index, literal
+
+    def _compile_operand(self, variable, index, literal):
+        if variable is None:
+            return lambda kwargs: literal
+
+        def operand_value(kwargs):
+            if variable not in kwargs:
+                return literal
+            value = kwargs[variable]
+            if isinstance(value, str):
+                value = self._convert(value)
+            if index is not None:
+                value = value[index]
+            return value
+
+        return operand_value
+
+    def _column_values(self, df, variable, index, literal):
+        if variable is None or variable not in df.columns:
+            return literal
+        column = df[variable]
+        if self.strings_to_numbers and column.dtype.kind == "O":
+            column = column.map(lambda value: _to_number(value) if isinstance(value, str) else value)
+        if index is not None:
+            column = column.str[index]
+        return column.to_numpy()
 
 
 
@@ -0,0 +1,229 @@
+"""
+This is a module that contains the PackedTree class.
+"""
+
+_missing = object()
+
+
+def _equals(column, target):
+    import numpy as np
+    scalar = np.empty((), dtype=object)
+    scalar[()] = target
+    return np.asarray(column == scalar, dtype=bool)
+
+
+class PackedTree:
+    """
+    A snapshot of a tree stored in flat arrays instead of linked `SuperNode` objects. It is created
+    using :py:meth:`~SuperNode.pack` and is useful when many bulk operations run on a tree that no
+    longer changes. Changes made to the tree after packing are not seen by the `PackedTree`.
+
+    The nodes are stored in pre-order, so position ``0`` is the packed node and the descendants
+    follow in the same order as :py:meth:`~SuperNode.find_nodes` returns them. The children of the
+    node at position ``i`` are ``children_indices[children_offsets[i]:children_offsets[i + 1]]``.
+
+    Attributes
+    ----------
+    nodes: list
+        The `SuperNode` objects of the tree. ``nodes[i]`` is the node at position ``i``.
+
+    names: numpy.ndarray
+        The `name` attribute of each node.
+
+    values: numpy.ndarray
+        The `value` attribute of each node.
+
+    ids: numpy.ndarray
+        The `id` attribute of each node.
+
+    children_offsets: numpy.ndarray
+        Where the children of each node start in `children_indices`. It has one more item than
+        `nodes`.
+
+    children_indices: numpy.ndarray
+        The positions of the children of every node.
+
+    Examples
+    --------
+
+    >>> from supernodes import SuperNode
+    >>> node = SuperNode(name="main-node")
+    >>> node['first-child'] = SuperNode(id=1)
+    >>> node['first-child']['grandchild'] = SuperNode(id=2)
+    >>> node['second-child'] = SuperNode(id=3)
+    >>> tree = node.pack()
+    >>> tree.to_list(attr="name")
+    [['main-node', 'first-child', 'grandchild'], ['main-node', 'second-child']]
+    >>> tree.find_node(2)
+    (name=grandchild, id=2)
+
+    """
+    def __init__(self, nodes, parents):
+        import numpy as np
+        self.nodes = nodes
+        self.names = self._object_array(node.name for node in nodes)
+        self.values = self._object_array(node.value for node in nodes)
+        self.ids = self._object_array(node.id for node in nodes)
+        parents = np.asarray(parents, dtype=np.intp)
+        self.children_offsets = np.zeros(len(nodes) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(parents[1:], minlength=len(nodes)), out=self.children_offsets[1:])
+        self.children_indices = np.argsort(parents[1:], kind="stable") + 1
+
+    @classmethod
+    def from_node(cls, root):
+        """
+        Packs `root` and its descendants.
+
+        Parameters
+        ----------
+        root: SuperNode
+
+        Returns
+        -------
+        tree: PackedTree
+
+        """
+        nodes = []
+        parents = []
+        stack = [(root, -1)]
+        while stack:
+            node, parent = stack.pop()
+            position = len(nodes)
+            nodes.append(node)
+            parents.append(parent)
+            stack.extend((child, position) for child in reversed(node.children))
+        return cls(nodes, parents)
+
+    @staticmethod
+    def _object_array(items):
+        import numpy as np
+        items = list(items)
+        array = np.empty(len(items), dtype=object)
+        array[:] = items
+        return array
+
+    def _column(self, attr):
+        from supernodes.nodes import _SERIALIZED_FIELDS
+        if not attr:
+            return self.nodes
+        if attr == "name":
+            return self.names.tolist()
+        if attr == "value":
+            return self.values.tolist()
+        if attr == "id":
+            return self.ids.tolist()
+        if attr in _SERIALIZED_FIELDS:
+            return [getattr(node, attr) for node in self.nodes]
+        return [node.other_attrs.get(attr, _missing) for node in self.nodes]
+
+    def _rows_iter(self, attr=None):
+        column = self._column(attr)
+        offsets = self.children_offsets.tolist()
+        children = self.children_indices.tolist()
+        row = []
+        stack = [(0, 0)]
+        while stack:
+            position, length = stack.pop()
+            del row[length:]
+            if column[position] is not _missing:
+                row.append(column[position])
+            start, end = offsets[position], offsets[position + 1]
+            if start == end:
+                yield tuple(row)
+            length = len(row)
+            for child in reversed(children[start:end]):
+                stack.append((child, length))
+
+    def to_list(self, attr=None):
+        """
+        Same as :py:meth:`~SuperNode.to_list`, but reads the packed arrays.
+
+        Returns
+        -------
+        arr: list
+            List of rows. Each row consists of nodes names.
+
+        """
+        return [list(row) for row in self._rows_iter(attr)]
+
+    def to_df(self, columns=None, ignore_first=True, attr="name"):
+        """
+        Same as :py:meth:`~SuperNode.to_df`, but reads the packed arrays.
+
+        Parameters
+        ----------
+        columns: list, default = None
+            The column headers for the `DataFrame`.
+
+        ignore_first: bool, default=True
+            If ``True``, the packed node will not be included in the `DataFrame`.
+
+        Returns
+        -------
+        df: pandas.DataFrame
+
+        """
+        import pandas as pd
+        rows = self._rows_iter(attr)
+        if ignore_first:
+            rows = (row[1:] for row in rows)
+        return pd.DataFrame(list(rows), columns=columns)
+
+    def find_node(self, id):
+        """
+        Same as :py:meth:`~SuperNode.find_node`, but compares the `ids` array.
+
+        Parameters
+        ----------
+        id: Any
+            The `id` attribute of the node.
+
+        Returns
+        -------
+        child: SuperNode
+
+        None
+
+        """
+        import numpy as np
+        positions = np.flatnonzero(_equals(self.ids[1:], id))
+        if len(positions):
+            return self.nodes[positions[0] + 1]
+
+    def find_nodes(self, name=None, value=None, function=None, **other_attrs):
+        """
+        Same as :py:meth:`~SuperNode.find_nodes`, but compares the `names` and `values` arrays.
+
+        Parameters
+        ----------
+        name: str, int, hashable
+
+        value: Any
+
+        function: Callable, str
+
+        Returns
+        -------
+        descendants: list of nodes
+
+        """
+        import numpy as np
+        mask = np.ones(len(self.nodes) - 1, dtype=bool)
+        if name:
+            mask &= _equals(self.names[1:], name)
+        if value:
+            mask &= _equals(self.values[1:], value)
+        descendants = []
+        for position in np.flatnonzero(mask) + 1:
+            node = self.nodes[position]
+            if function and node.function != function:
+                continue
+            if all(key in node.other_attrs and attr_value == node.other_attrs[key]
+                   for key, attr_value in other_attrs.items()):
+                descendants.append(node)
+        return descendants
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
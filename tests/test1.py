@@ -1,8 +1,55 @@
+import copy
+import os
+import pickle
+import sys
+import tempfile
 import unittest
-from supernodes import SuperNode
+from unittest import mock
+import pandas as pd
+from supernodes import SuperNode, InEquality
+from supernodes.compiled import _predict_kernel
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def build_decision_tree():
+    root = SuperNode(name="root", function="x > 1")
+    root.child_name_if_true = "child-1"
+    root.child_name_if_false = "child-2"
+    root["child-1"] = SuperNode(value=1, function="0 == y")
+    root["child-1"].child_name_if_true = "grandchild-1"
+    root["child-2"] = SuperNode(value=2)
+    root['child-1']['grandchild-1'] = SuperNode(value=3)
+    return root
+
+
+def build_search_tree():
+    root = SuperNode(name="root", id=0)
+    root["child-1"] = SuperNode(id=1, color="red")
+    root["child-1"]["grandchild-1"] = SuperNode(id=2)
+    root["child-2"] = SuperNode(id=3, color="red")
+    return root
+
+
+def build_saved_tree():
+    root = SuperNode(name="root", value={"rows": [1, 2.5, None], "labels": {"a": "first\nsecond"}},
+                     function="x > 1", child_name_if_true="child-1", color="red")
+    root["child-1"] = SuperNode(value="line 1\nline 2", id=1)
+    root["child-1"]["grandchild-1"] = SuperNode(value=[[1, 2], {"k": True}])
+    return root
 
 class TestTree(unittest.TestCase):
 
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def temp_path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
     def test_create_children(self):
         root = SuperNode(name="root", value=0)
         root["child-1"] = SuperNode(value=1)
@@ -24,6 +71,188 @@ class TestTree(unittest.TestCase):
         leaf2 = root.run_as_binary_tree(x=[0, 2])
         self.assertEqual(leaf2.value, 2)
 
+    def test_decision_tree_batch(self):
+        root = build_decision_tree()
+        df = pd.DataFrame({"x": [2, 0, 2], "y": [0, 0, 1]})
+        leaves = root.run_as_binary_tree_batch(df)
+        self.assertEqual([leaf.value for leaf in leaves], [3, 2, 1])
+        df = pd.DataFrame({"x": ["2", "0", "2"], "y": ["0", "0", "1"]})
+        leaves = root.run_as_binary_tree_batch(df)
+        self.assertEqual(list(leaves), [root.run_as_binary_tree(**row) for row in df.to_dict("records")])
+
+    def test_copy(self):
+        root = build_search_tree()
+        clone = copy.copy(root)
+        self.assertEqual(clone.to_node_dict(), root.to_node_dict())
+        originals = [root] + root.find_nodes()
+        clones = [clone] + clone.find_nodes()
+        self.assertEqual(len(clones), len(originals))
+        for original, cloned in zip(originals, clones):
+            self.assertIsNot(cloned, original)
+            self.assertIsNot(cloned.other_attrs, original.other_attrs)
+        self.assertIs(clone["child-1"]["grandchild-1"], clones[2])
+        clone["child-1"].other_attrs["color"] = "blue"
+        clone["child-2"].other_attrs["size"] = 2
+        self.assertEqual(root["child-1"].other_attrs, {"color": "red"})
+        self.assertEqual(root["child-2"].other_attrs, {"color": "red"})
+
+    def test_find_nodes(self):
+        root = build_search_tree()
+        self.assertIs(root.find_node(2), root["child-1"]["grandchild-1"])
+        self.assertIsNone(root.find_node(4))
+        self.assertEqual([node.id for node in root.find_nodes(color="red")], [1, 3])
+
+    def test_compiled_tree(self):
+        root = build_decision_tree()
+        tree = root.compile(features=["x", "y"])
+        X = [[2, 0], [0, 0], [2, 1]]
+        leaves = [tree.nodes[i] for i in tree.predict(X)]
+        self.assertEqual([leaf.value for leaf in leaves], [3, 2, 1])
+        self.assertEqual(leaves, [root.run_as_binary_tree(x=x, y=y) for x, y in X])
+
+    @unittest.skipUnless(numba, "numba is not installed")
+    def test_compiled_tree_numba(self):
+        import numpy as np
+        tree = build_decision_tree().compile(features=["x", "y"])
+        X = np.array([[x, y] for x in range(-1, 4) for y in range(-1, 3)], dtype=float)
+        self.assertIsNotNone(_predict_kernel())
+        np.testing.assert_array_equal(tree.predict(X), tree._predict_levels(X))
+
+    def test_packed_tree(self):
+        root = build_search_tree()
+        tree = root.pack()
+        self.assertEqual(tree.to_list(attr="id"), root.to_list(attr="id"))
+        self.assertTrue(tree.to_df().equals(root.to_df()))
+        self.assertIs(tree.find_node(2), root.find_node(2))
+        self.assertEqual(tree.find_nodes(color="red"), root.find_nodes(color="red"))
+
+    def test_empty_rows_df(self):
+        root = build_search_tree()
+        self.assertEqual(root.to_df(attr="missing").shape, (len(root.to_list()), 0))
+        self.assertEqual(root.pack().to_df(attr="missing").shape, (len(root.to_list()), 0))
+        self.assertEqual(SuperNode(name="root").to_df().shape, (1, 0))
+
+    def test_get_attributes(self):
+        node = SuperNode(name="root", color="red")
+        self.assertEqual(node.get_attributes(none_attrs=False), {"name": "root", "children": [], "color": "red"})
+        self.assertEqual(str(node), "(name=root, color=red)")
+
+    def test_insert(self):
+        root = SuperNode(name="root")
+        root.append(SuperNode(name="child-2"))
+        root.insert(0, SuperNode(name="child-1"))
+        self.assertEqual(root.get_children_names(), ["child-1", "child-2"])
+        self.assertIs(root.get_child_from_name("child-1"), root.children[0])
+        with self.assertRaises(ValueError):
+            root.insert(1, SuperNode(name="child-2"))
+
+    def test_rename_child(self):
+        root = SuperNode(name="root")
+        root.append(SuperNode())
+        root.children[0].name = "child-1"
+        self.assertIs(root["child-1"], root.children[0])
+        root.children[0].name = "child-2"
+        self.assertIsNone(root["child-1"])
+        root.append(SuperNode(name="child-1"))
+        self.assertEqual(root.get_children_names(), ["child-2", "child-1"])
+        root.children.pop()
+        self.assertIsNone(root["child-1"])
+        loaded = pickle.loads(pickle.dumps(root))
+        loaded.children[0].name = "child-3"
+        self.assertIs(loaded["child-3"], loaded.children[0])
+        with self.assertRaises(ValueError):
+            loaded.append(SuperNode(name="child-3"))
+
+    def test_append_without_reindexing(self):
+        root = SuperNode(name="root")
+        children = [(SuperNode(name=num), SuperNode(value=num)) for num in range(1000)]
+        with mock.patch.object(SuperNode, "_index_children", autospec=True,
+                               side_effect=SuperNode._index_children) as index_children:
+            for num, (child, other_child) in enumerate(children):
+                root.append(child)
+                root[f"child-{num}"] = other_child
+        self.assertEqual(index_children.call_count, 0)
+        self.assertEqual(len(root.children), 2000)
+        self.assertEqual(root["child-999"].value, 999)
+
+    def test_yaml(self):
+        import yaml
+        root = build_saved_tree()
+        root.to_yaml(self.temp_path("tree.yaml"))
+        with open(self.temp_path("tree.yaml")) as file:
+            self.assertEqual(file.read(), yaml.dump(root.to_node_dict(), sort_keys=False))
+        loaded = SuperNode()
+        loaded.from_yaml(self.temp_path("tree.yaml"))
+        self.assertEqual(loaded.to_node_dict(), root.to_node_dict())
+        root["child-1"].function = InEquality("y < 2", strings_to_numbers=False)
+        root.to_yaml(self.temp_path("function.yaml"))
+        with open(self.temp_path("function.yaml")) as file:
+            text = file.read()
+        self.assertEqual(text, yaml.dump(root.to_node_dict(), sort_keys=False))
+        function = yaml.unsafe_load(text)["children"][0]["function"]
+        self.assertIsInstance(function, InEquality)
+        self.assertEqual((function.left, function.middle, function.right), ("y", "<", "2"))
+        self.assertFalse(function.strings_to_numbers)
+        self.assertTrue(function(y="1"))
+
+    def test_pickle(self):
+        root = build_saved_tree()
+        root["child-1"].function = InEquality("y < 2")
+        root["child-1"].child_name_if_true = "grandchild-1"
+        root.to_pickle(self.temp_path("tree.pickle"))
+        loaded = SuperNode()
+        loaded.from_pickle(self.temp_path("tree.pickle"))
+        function = loaded["child-1"].function
+        self.assertIsInstance(function, InEquality)
+        self.assertEqual((function.left, function.middle, function.right), ("y", "<", "2"))
+        self.assertEqual(loaded.run_as_binary_tree(x=2, y=1).name, "grandchild-1")
+        loaded["child-1"].function = root["child-1"].function
+        self.assertEqual(loaded.to_node_dict(), root.to_node_dict())
+
+    def test_pickle_inequality(self):
+        inequality = pickle.loads(pickle.dumps(InEquality("x[1] >= 2.5")))
+        self.assertEqual((inequality.left, inequality.middle, inequality.right), ("x[1]", ">=", "2.5"))
+        self.assertTrue(inequality(x=[0, 3]))
+        self.assertFalse(inequality(x=[0, 2]))
+        inequality = pickle.loads(pickle.dumps(InEquality("x == 2.5", strings_to_numbers=False)))
+        self.assertFalse(inequality.strings_to_numbers)
+        self.assertFalse(inequality(x="2.50"))
+
+    def test_pickle_after_run(self):
+        root = build_decision_tree()
+        root.run_as_binary_tree(x=2, y=0)
+        loaded = pickle.loads(pickle.dumps(root))
+        self.assertIsNone(loaded["child-1"]._compiled_function)
+        self.assertEqual(loaded.to_node_dict(), root.to_node_dict())
+        self.assertEqual(loaded.run_as_binary_tree(x=2, y=0).value, 3)
+
+    def test_json(self):
+        root = build_saved_tree()
+        root["child-1"].function = InEquality("y < 2")
+        root.to_json(self.temp_path("tree.json"))
+        loaded = SuperNode()
+        loaded.from_json(self.temp_path("tree.json"))
+        self.assertEqual(loaded["child-1"].function, "y < 2")
+        loaded["child-1"].function = root["child-1"].function
+        self.assertEqual(loaded.to_node_dict(), root.to_node_dict())
+        self.assertEqual(loaded.run_as_binary_tree(x=2, y=1).name, "child-1")
+        with self.assertRaises(TypeError):
+            SuperNode(function=len).to_json(self.temp_path("function.json"))
+
+    def test_json_numpy(self):
+        import numpy as np
+        root = SuperNode(name="root", value=np.int64(3), weights=np.array([1.5, 2.0]))
+        loaded_nodes = []
+        for modules in ({}, {"orjson": None}):
+            with mock.patch.dict(sys.modules, modules):
+                root.to_json(self.temp_path("tree.json"))
+            loaded = SuperNode()
+            loaded.from_json(self.temp_path("tree.json"))
+            loaded_nodes.append(loaded)
+        for loaded in loaded_nodes:
+            self.assertEqual(loaded.value, 3)
+            self.assertEqual(loaded.other_attrs["weights"], [1.5, 2.0])
+
 if __name__ == "__main__":
     unittest.main()
 